@@ -0,0 +1,56 @@
+import sys
+import datetime
+import tracemalloc
+import pytz
+from chat_message import ChatMessage, Feedback
+
+# Benchmark memori per pesan: dict lama (datetime pytz) vs ChatMessage (__slots__).
+# Jalankan: python bench_memory.py [jumlah_pesan]
+# Konten pesan dibuat sebelum pengukuran agar yang terukur hanya overhead per pesan.
+
+TARGET_TZ = pytz.timezone("Asia/Bangkok") # GMT+7, sama seperti chatai.py
+
+
+def build_legacy_messages(contents, roles, base_time):
+    messages = []
+    for i, (role, content) in enumerate(zip(roles, contents)):
+        message_data = {"role": role, "content_text": content, "timestamp": base_time + datetime.timedelta(seconds=i)}
+        if role == "assistant": message_data["feedback"] = None
+        messages.append(message_data)
+    return messages
+
+
+def build_compact_messages(contents, roles, base_time):
+    return [ChatMessage.from_dict({"role": role, "content_text": content, "timestamp": base_time + datetime.timedelta(seconds=i), "feedback": None}) for i, (role, content) in enumerate(zip(roles, contents))]
+
+
+def measure_bytes_per_message(builder, contents, roles, base_time):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    messages = builder(contents, roles, base_time)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(messages), messages
+
+
+def main(n_messages=20000):
+    # Role dibuat ulang dari JSON (tidak ter-intern) seperti saat unggah riwayat
+    roles = [("user" if i % 2 == 0 else "assistant").encode().decode() for i in range(n_messages)]
+    contents = [f"Pesan nomor {i}" for i in range(n_messages)]
+    base_time = datetime.datetime.now(TARGET_TZ)
+
+    legacy_bpm, legacy_messages = measure_bytes_per_message(build_legacy_messages, contents, roles, base_time)
+    compact_bpm, compact_messages = measure_bytes_per_message(build_compact_messages, contents, roles, base_time)
+
+    # Pastikan konversi di batas ekspor menghasilkan data yang sama
+    assert all(m.to_dict(TARGET_TZ) == d for m, d in zip(compact_messages, legacy_messages))
+    assert all(m.feedback is Feedback.NONE for m in compact_messages)
+
+    print(f"Jumlah pesan      : {n_messages}")
+    print(f"Sebelum (dict)    : {legacy_bpm:.1f} byte/pesan")
+    print(f"Sesudah (slots)   : {compact_bpm:.1f} byte/pesan")
+    print(f"Penghematan       : {100 * (1 - compact_bpm / legacy_bpm):.1f}%")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,72 @@
+import sys
+import datetime
+import enum
+
+# --- Representasi Pesan Ringkas ---
+# Setiap chat menyimpan seluruh pesannya di session state. Dict per pesan (role, datetime
+# ber-tzinfo pytz, konten, feedback) memakan banyak memori, jadi pesan disimpan sebagai
+# objek __slots__: role di-intern, timestamp berupa integer epoch (mikrodetik, UTC) dan
+# feedback berupa enum. Konversi ke dict hanya dilakukan di batas API dan ekspor.
+
+VALID_ROLES = ("user", "assistant", "system")
+
+
+class Feedback(enum.IntEnum):
+    NONE = 0
+    LIKE = 1
+    DISLIKE = 2
+
+    @classmethod
+    def from_value(cls, value):
+        if isinstance(value, cls): return value
+        if value == "like": return cls.LIKE
+        if value == "dislike": return cls.DISLIKE
+        return cls.NONE
+
+    def to_value(self):
+        if self is Feedback.LIKE: return "like"
+        if self is Feedback.DISLIKE: return "dislike"
+        return None
+
+
+def datetime_to_epoch_us(dt_obj):
+    # Datetime naive dianggap UTC; timestamp() tidak dipakai agar tidak ada pembulatan float
+    if dt_obj.tzinfo is None: dt_obj = dt_obj.replace(tzinfo=datetime.timezone.utc)
+    delta = dt_obj - datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def epoch_us_to_datetime(ts_us, tz):
+    return datetime.datetime.fromtimestamp(ts_us // 1_000_000, tz=tz).replace(microsecond=ts_us % 1_000_000)
+
+
+class ChatMessage:
+    __slots__ = ("role", "content_text", "ts", "feedback")
+
+    def __init__(self, role, content_text, ts, feedback=Feedback.NONE):
+        self.role = sys.intern(role)
+        self.content_text = content_text
+        self.ts = ts # Integer epoch mikrodetik (UTC)
+        self.feedback = Feedback.from_value(feedback)
+
+    def __repr__(self):
+        return f"ChatMessage(role={self.role!r}, ts={self.ts}, feedback={self.feedback.name}, content_text={self.content_text[:30]!r})"
+
+    @classmethod
+    def from_dict(cls, message_dict):
+        # Menerima dict format lama: {"role", "content_text", "timestamp": datetime, "feedback"}
+        ts_data = message_dict["timestamp"]
+        ts_us = ts_data if isinstance(ts_data, int) else datetime_to_epoch_us(ts_data)
+        return cls(message_dict["role"], str(message_dict["content_text"]), ts_us, message_dict.get("feedback"))
+
+    def timestamp_in(self, tz):
+        return epoch_us_to_datetime(self.ts, tz)
+
+    def to_api_dict(self):
+        return {"role": self.role, "content": str(self.content_text)}
+
+    def to_dict(self, tz):
+        # Bentuk dict lama, untuk ekspor riwayat
+        message_dict = {"role": self.role, "content_text": self.content_text, "timestamp": self.timestamp_in(tz)}
+        if self.role == "assistant": message_dict["feedback"] = self.feedback.to_value()
+        return message_dict
@@ -6,6 +6,7 @@ import re
 import pytz # Untuk penanganan zona waktu GMT+7
 import base64 # Untuk memainkan suara notifikasi
 import os # Untuk mengecek path file suara
+from chat_message import ChatMessage, Feedback, datetime_to_epoch_us, epoch_us_to_datetime # Pesan ringkas (__slots__)
 
 # -- Konfigurasi Awal & Variabel Global --
 APP_VERSION = "Chatbot AI"
@@ -107,6 +108,14 @@ def convert_to_gmt7(dt_obj):
     if dt_obj.tzinfo is None: return TARGET_TZ.localize(dt_obj)
     return dt_obj.astimezone(TARGET_TZ)
 
+def to_epoch_us(ts_input):
+    # Timestamp pesan disimpan sebagai integer epoch; datetime GMT+7 hanya dibuat untuk tampilan/ekspor
+    if isinstance(ts_input, int): return ts_input
+    return datetime_to_epoch_us(convert_to_gmt7(ts_input) if ts_input is not None else get_gmt7_now())
+
+def epoch_to_gmt7(ts_us):
+    return epoch_us_to_datetime(ts_us, TARGET_TZ)
+
 # --- Callbacks ---
 def update_system_prompt_from_persona_callback():
     # ... (fungsi sama seperti v1.1.13) ...
@@ -168,10 +177,7 @@ def append_message_to_current_chat(role, content_text, timestamp=None, feedback=
     chat_id = st.session_state.current_chat_id
     if chat_id and chat_id in st.session_state.all_chats:
         messages = st.session_state.all_chats[chat_id]["messages"]
-        current_time = timestamp or get_gmt7_now()
-        message_data = {"role": role, "content_text": content_text, "timestamp": current_time}
-        if role == "assistant": message_data["feedback"] = feedback 
-        messages.append(message_data)
+        messages.append(ChatMessage(role, content_text, to_epoch_us(timestamp), feedback))
         if role == "user": update_chat_title_from_prompt(chat_id, content_text)
 
 
@@ -209,6 +215,7 @@ def get_bot_response_stream(messages_for_api, selected_model_id, temperature):
 
 def format_timestamp_display(ts_obj_input):
     # ... (fungsi sama seperti v1.1.13) ...
+    if isinstance(ts_obj_input, int): return epoch_to_gmt7(ts_obj_input).strftime("%H:%M:%S")
     if not isinstance(ts_obj_input, datetime.datetime):
         try: ts_obj = datetime.datetime.fromisoformat(str(ts_obj_input).replace("Z", "+00:00"))
         except: return str(ts_obj_input)
@@ -217,6 +224,7 @@ def format_timestamp_display(ts_obj_input):
 
 def format_timestamp_export(ts_obj_input):
     # ... (fungsi sama seperti v1.1.13) ...
+    if isinstance(ts_obj_input, int): return epoch_to_gmt7(ts_obj_input).strftime("%Y-%m-%d %H:%M:%S %Z%z")
     if not isinstance(ts_obj_input, datetime.datetime):
         try: ts_obj = datetime.datetime.fromisoformat(str(ts_obj_input).replace("Z", "+00:00"))
         except: return str(ts_obj_input)
@@ -229,7 +237,7 @@ def prepare_messages_for_api(chat_messages_list, system_prompt):
     messages = [{"role": "system", "content": system_prompt}]
     history_len = st.session_state.get("max_history_length", DEFAULT_MAX_HISTORY_LENGTH)
     relevant_history = chat_messages_list[-history_len:]
-    for msg in relevant_history: messages.append({"role": msg["role"], "content": str(msg.get("content_text",""))})
+    for msg in relevant_history: messages.append(msg.to_api_dict())
     return messages
 
 def handle_automation_command(command_input, current_model_info, chat_messages_list):
@@ -246,7 +254,7 @@ def handle_automation_command(command_input, current_model_info, chat_messages_l
         return f"Waktu saat ini (GMT+7): {get_gmt7_now().strftime('%Y-%m-%d %H:%M:%S %Z%z')}"
     elif command == "!summarize_chat":
         if not chat_messages_list: return "Riwayat chat kosong."
-        conversation_text = "\n".join([f"{msg['role']}: {msg['content_text']}" for msg in chat_messages_list if msg.get('content_text') and not str(msg.get('content_text', '')).startswith("🛑")])
+        conversation_text = "\n".join([f"{msg.role}: {msg.content_text}" for msg in chat_messages_list if msg.content_text and not str(msg.content_text).startswith("🛑")])
         if not conversation_text.strip(): return "Tidak ada konten chat untuk dirangkum."
         st.info(f"Merangkum {len(chat_messages_list)} pesan...")
         summary_prompt = [{"role": "system", "content": "Summarize this conversation concisely:"}, {"role": "user", "content": conversation_text}]
@@ -291,7 +299,7 @@ def parse_json_history(json_string_content):
                 elif isinstance(ts_data, (int, float)): timestamp_obj = datetime.datetime.fromtimestamp(ts_data, tz=pytz.utc).astimezone(TARGET_TZ)
                 else: st.warning(f"Tipe timestamp JSON '{type(ts_data)}' tidak dikenal."); timestamp_obj = get_gmt7_now()
                 
-                processed_history.append({"role": role, "content_text": str(item_raw["content_text"]), "timestamp": timestamp_obj, "feedback": item_raw.get("feedback")})
+                processed_history.append(ChatMessage(role, str(item_raw["content_text"]), to_epoch_us(timestamp_obj), item_raw.get("feedback")))
             else: st.warning(f"Item JSON tidak valid: {str(item_raw)[:100]}")
         return processed_history
     except Exception as e: st.error(f"Error proses JSON: {e}"); return None
@@ -309,7 +317,7 @@ def parse_txt_history(txt_string_content):
         else: st.warning(f"Format TXT tidak dikenali: {msg_str[:100]}"); continue
         timestamp_obj = parse_timestamp_from_string(timestamp_str)
         role = "user" if role_str.lower() == "user" else "assistant"
-        processed_history.append({"role": role, "content_text": content.strip(), "timestamp": timestamp_obj, "feedback": None}) 
+        processed_history.append(ChatMessage(role, content.strip(), to_epoch_us(timestamp_obj)))
     return processed_history
 
 
@@ -325,7 +333,7 @@ def parse_md_history(md_string_content):
         else: st.warning(f"Format MD tidak dikenali: {msg_block[:100]}"); continue
         timestamp_obj = parse_timestamp_from_string(timestamp_str)
         role = "user" if role_str.lower() == "user" else "assistant"
-        processed_history.append({"role": role, "content_text": content.strip(), "timestamp": timestamp_obj, "feedback": None})
+        processed_history.append(ChatMessage(role, content.strip(), to_epoch_us(timestamp_obj)))
     return processed_history
 
 # --- Fungsi Manajemen Chat ---
@@ -342,11 +350,10 @@ def create_new_chat(switch_to_it=True, initial_messages=None, title_prefix="Chat
     processed_initial_messages = []
     if initial_messages:
         for msg in initial_messages:
-            if msg.get("role") == "assistant" and "feedback" not in msg: msg["feedback"] = None
-            processed_initial_messages.append(msg)
+            processed_initial_messages.append(msg if isinstance(msg, ChatMessage) else ChatMessage.from_dict(msg))
     else: # Pesan sapaan default jika chat baru dibuat dari tombol "New Chat"
         sapaan_text = f"Sesi '{final_title}' dimulai. Siap membantu!"
-        processed_initial_messages.append({"role": "assistant", "content_text": sapaan_text, "timestamp": current_time, "feedback": None})
+        processed_initial_messages.append(ChatMessage("assistant", sapaan_text, to_epoch_us(current_time)))
 
     st.session_state.all_chats[chat_id] = {"messages": processed_initial_messages, "created_at": current_time, "title": final_title, "title_is_fixed": title_is_fixed, "is_pinned": is_pinned, "pinned_at": current_time if is_pinned else None}
     if switch_to_it: st.session_state.current_chat_id = chat_id
@@ -354,8 +361,8 @@ def create_new_chat(switch_to_it=True, initial_messages=None, title_prefix="Chat
     # Coba set judul dari pesan pertama jika dari upload dan belum fixed (meskipun upload biasanya fixed)
     # atau jika initial_messages diberikan tetapi BUKAN dari upload (jarang terjadi)
     if initial_messages and not title_is_fixed and not uploaded_filename: 
-        first_user_msg = next((msg for msg in initial_messages if msg["role"] == "user"), None)
-        if first_user_msg: update_chat_title_from_prompt(chat_id, first_user_msg["content_text"])
+        first_user_msg = next((msg for msg in processed_initial_messages if msg.role == "user"), None)
+        if first_user_msg: update_chat_title_from_prompt(chat_id, first_user_msg.content_text)
     return chat_id
 
 
@@ -492,7 +499,7 @@ with search_col2:
 if st.session_state.get("generation_cancelled_by_user", False) and st.session_state.current_chat_id :
     cancelled_message_text = "🛑 Generasi dihentikan oleh pengguna."
     current_msgs_list = get_current_chat_messages()
-    if not current_msgs_list or not (current_msgs_list[-1]["role"] == "assistant" and current_msgs_list[-1]["content_text"] == cancelled_message_text):
+    if not current_msgs_list or not (current_msgs_list[-1].role == "assistant" and current_msgs_list[-1].content_text == cancelled_message_text):
         append_message_to_current_chat("assistant", cancelled_message_text)
     st.toast("Generasi telah dibatalkan.", icon="🛑")
     st.session_state.generating = False; st.session_state.stop_generating = False; st.session_state.generation_cancelled_by_user = False
@@ -502,21 +509,21 @@ current_chat_messages_list_main_all = get_current_chat_messages()
 messages_to_display = current_chat_messages_list_main_all
 if st.session_state.active_chat_search_query:
     query = st.session_state.active_chat_search_query.lower()
-    messages_to_display = [msg for msg in current_chat_messages_list_main_all if query in msg.get("content_text", "").lower()]
+    messages_to_display = [msg for msg in current_chat_messages_list_main_all if query in msg.content_text.lower()]
     if not messages_to_display: st.info(f"Tidak ada pesan yang cocok dengan '{st.session_state.active_chat_search_query}'.")
 
 for i, chat_item_display in enumerate(messages_to_display):
     original_message_object, original_message_index = None, -1
     all_current_messages_for_idx_search = get_current_chat_messages() # Ambil list pesan asli untuk pencarian index
     try:
-        original_index = next(idx for idx, original_item in enumerate(all_current_messages_for_idx_search) if original_item.get("timestamp") == chat_item_display.get("timestamp") and original_item.get("role") == chat_item_display.get("role") and original_item.get("content_text") == chat_item_display.get("content_text"))
+        original_index = next(idx for idx, original_item in enumerate(all_current_messages_for_idx_search) if original_item is chat_item_display)
         original_message_object = all_current_messages_for_idx_search[original_index]
     except StopIteration: original_message_index = i; original_message_object = chat_item_display # Fallback
 
-    avatar_icon = "👤" if chat_item_display['role'] == "user" else "🤖"
-    ts_obj = chat_item_display.get('timestamp', get_gmt7_now())
-    with st.chat_message(chat_item_display['role'], avatar=avatar_icon):
-        content_to_display = chat_item_display["content_text"]
+    avatar_icon = "👤" if chat_item_display.role == "user" else "🤖"
+    ts_val = chat_item_display.ts # Integer epoch, dikonversi ke GMT+7 hanya saat ditampilkan
+    with st.chat_message(chat_item_display.role, avatar=avatar_icon):
+        content_to_display = chat_item_display.content_text
         if st.session_state.active_chat_search_query:
             search_term = st.session_state.active_chat_search_query
             try:
@@ -524,40 +531,38 @@ for i, chat_item_display in enumerate(messages_to_display):
                 st.markdown(highlighted_content, unsafe_allow_html=True)
             except re.error: st.markdown(content_to_display)
         else: st.markdown(content_to_display)
-        code_blocks_matches = re.finditer(r"```(\w*)\n([\s\S]*?)\n```", chat_item_display["content_text"])
+        code_blocks_matches = re.finditer(r"```(\w*)\n([\s\S]*?)\n```", chat_item_display.content_text)
         for block_idx, match in enumerate(code_blocks_matches):
             lang, code = (match.group(1).strip() or "plaintext"), match.group(2).strip()
-            ts_val_for_key = ts_obj.timestamp() if isinstance(ts_obj, datetime.datetime) else hash(str(ts_obj))
             chat_id_for_key = st.session_state.current_chat_id or "no_active_chat"
             msg_idx_for_key = original_index if original_index != -1 else i
-            base_key = f"{chat_id_for_key}_{msg_idx_for_key}_{block_idx}_{ts_val_for_key}"
+            base_key = f"{chat_id_for_key}_{msg_idx_for_key}_{block_idx}_{ts_val}"
             exp_key, code_key = f"exp_{base_key}", f"code_{base_key}"
             exp_label = f"Kode #{block_idx+1} ({lang})"
             try:
                 with st.expander(exp_label, expanded=False, key=exp_key): st.code(code, language=lang, key=code_key)
             except Exception as e: st.error(f"Error expander: {e} (K: {exp_key})")
         
-        if chat_item_display['role'] == 'assistant' and original_index != -1:
-            feedback_key_base = f"fb_{st.session_state.current_chat_id}_{original_index}_{ts_obj.timestamp()}"
-            current_feedback = original_message_object.get("feedback")
+        if chat_item_display.role == 'assistant' and original_index != -1:
+            feedback_key_base = f"fb_{st.session_state.current_chat_id}_{original_index}_{ts_val}"
+            current_feedback = original_message_object.feedback
             fb_cols = st.columns([0.1, 0.1, 0.8]) # Sesuaikan rasio kolom
             with fb_cols[0]:
-                like_txt = "👍 Liked" if current_feedback == "like" else "👍"
+                like_txt = "👍 Liked" if current_feedback is Feedback.LIKE else "👍"
                 if st.button(like_txt, key=f"{feedback_key_base}_L", help="Suka", use_container_width=True):
-                    original_message_object["feedback"] = None if current_feedback == "like" else "like"; st.rerun()
+                    original_message_object.feedback = Feedback.NONE if current_feedback is Feedback.LIKE else Feedback.LIKE; st.rerun()
             with fb_cols[1]:
-                dis_txt = "👎 Disliked" if current_feedback == "dislike" else "👎"
+                dis_txt = "👎 Disliked" if current_feedback is Feedback.DISLIKE else "👎"
                 if st.button(dis_txt, key=f"{feedback_key_base}_D", help="Tidak Suka", use_container_width=True):
-                    original_message_object["feedback"] = None if current_feedback == "dislike" else "dislike"; st.rerun()
+                    original_message_object.feedback = Feedback.NONE if current_feedback is Feedback.DISLIKE else Feedback.DISLIKE; st.rerun()
         
         is_truly_last_message_in_chat = (original_index == len(all_current_messages_for_idx_search) - 1) if original_index != -1 else False
         caption_cols_main, regen_cols_main = st.columns([0.85,0.15])
-        with caption_cols_main: st.caption(f"_{format_timestamp_display(ts_obj)}_")
-        if not st.session_state.active_chat_search_query and is_truly_last_message_in_chat and chat_item_display['role'] == 'assistant' and not st.session_state.generating and not str(chat_item_display.get("content_text","")).startswith("🛑"):
+        with caption_cols_main: st.caption(f"_{format_timestamp_display(ts_val)}_")
+        if not st.session_state.active_chat_search_query and is_truly_last_message_in_chat and chat_item_display.role == 'assistant' and not st.session_state.generating and not str(chat_item_display.content_text).startswith("🛑"):
             with regen_cols_main:
-                ts_val_for_regen = ts_obj.timestamp() if isinstance(ts_obj, datetime.datetime) else hash(str(ts_obj))
                 chat_id_for_regen = st.session_state.current_chat_id or "no_chat_regen"
-                regen_key_main = f"regen_main_{chat_id_for_regen}_{original_index}_{ts_val_for_regen}"
+                regen_key_main = f"regen_main_{chat_id_for_regen}_{original_index}_{ts_val}"
                 if st.button("🔄", key=regen_key_main, help="Regenerate", use_container_width=True): 
                     st.session_state.regenerate_request = True
                     active_chat_msgs = get_current_chat_messages()
@@ -583,7 +588,7 @@ if process_input_flag and not st.session_state.generating and st.session_state.c
     if input_source == "regenerate":
         st.session_state.regenerate_request = False
         active_msgs = get_current_chat_messages()
-        if active_msgs and active_msgs[-1]["role"] == "user": messages_for_llm_call = prepare_messages_for_api(active_msgs, st.session_state.system_prompt)
+        if active_msgs and active_msgs[-1].role == "user": messages_for_llm_call = prepare_messages_for_api(active_msgs, st.session_state.system_prompt)
         elif not active_msgs: messages_for_llm_call = prepare_messages_for_api([], st.session_state.system_prompt)
         else: st.warning("Regenerasi gagal."); st.session_state.generating = False; st.rerun(); process_input_flag = False
     
@@ -604,7 +609,7 @@ if process_input_flag and not st.session_state.generating and st.session_state.c
         st.session_state.pending_llm_automation = None
 
     if direct_bot_response_content:
-        append_message_to_current_chat("assistant", direct_bot_response_content, feedback=None) # Tambah feedback=None
+        append_message_to_current_chat("assistant", direct_bot_response_content)
         st.session_state.generating = False; st.rerun()
     
     elif messages_for_llm_call and process_input_flag:
@@ -635,7 +640,7 @@ if process_input_flag and not st.session_state.generating and st.session_state.c
         
         if not st.session_state.generation_cancelled_by_user:
             if full_bot_response: 
-                append_message_to_current_chat("assistant", full_bot_response, bot_ts, feedback=None) # Tambah feedback=None saat buat pesan bot
+                append_message_to_current_chat("assistant", full_bot_response, bot_ts)
                 if not full_bot_response.startswith("🛑"): 
                     st.session_state.play_sound_once = True # Set flag untuk mainkan suara
             